@@ -1,10 +1,11 @@
 import math
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, jsonify
 import os
 from werkzeug.utils import secure_filename
 
 import cv2 as cv
+import numpy as np
 
 app = Flask(__name__)
 
@@ -12,15 +13,43 @@ app.secret_key = "My-Informatics"
 
 UPLOAD_FOLDER = 'static/uploads'
 # app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-# app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
 ALLOWED_EXTENSIONS = set(['txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif'])
 
+# cv.imdecode releases the GIL, so uploads in one request decode in parallel
+decode_pool = ThreadPoolExecutor()
+
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def read_upload(file):
+    # wrap the uploaded bytes for cv.imdecode without copying them;
+    # MAX_CONTENT_LENGTH bounds how much can be read
+    return np.frombuffer(file.read(), np.uint8)
+
+
+def decode_image(buf):
+    # cv.imdecode raises on an empty buffer instead of returning None
+    if buf.size == 0:
+        return None
+    # only the size is used, so decode to one channel and free the array
+    # straight away
+    image = cv.imdecode(buf, cv.IMREAD_GRAYSCALE)
+    if image is None:
+        return None
+    return image.shape[:2]
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    resp = jsonify({'message': 'File(s) larger than 16 MB are not allowed'})
+    resp.status_code = 413
+    return resp
+
+
 @app.route('/')
 def main():
     return 'formalinapp_api works !'
@@ -38,11 +67,13 @@ def upload_file():
 
     errors = {}
     success = False
+    uploads = []
 
-    for file in files:
+    for index, file in enumerate(files):
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             # file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+            uploads.append((index, file))
             success = True
         else:
             errors[file.filename] = 'File type is not allowed'
@@ -54,17 +85,42 @@ def upload_file():
         resp.status_code = 500
         return resp
     if success:
-        img = Image.open(file.stream)
-        image = cv.imread(file.stream)
-        # (h, w) = image.shape[:2]
-
-        # Machine Learning Code Below
-        # ------------------------------------------------
-        # Radius = random()
-
-        # -------------------------------------------------------
+        buffers = [read_upload(file) for _, file in uploads]
+        shapes = list(decode_pool.map(decode_image, buffers))
+
+        # entries carry the upload's position, so repeated names stay distinct
+        results = []
+        unreadable = []
+        for (index, file), shape in zip(uploads, shapes):
+            if shape is None:
+                unreadable.append({'index': index, 'file': file.filename,
+                                   'error': 'File is not a readable image'})
+                continue
+            (h, w) = shape
+
+            # Machine Learning Code Below
+            # ------------------------------------------------
+            # Radius = random()
+
+            # -------------------------------------------------------
+            results.append({'index': index, 'file': file.filename,
+                            'size': [w, h], "Centroid": [h//2, w//2]})
+
+        if not results:
+            resp = jsonify({'message': 'File is not a readable image',
+                            'errors': unreadable})
+            resp.status_code = 400
+            return resp
+        if unreadable:
+            resp = jsonify({'message': 'File(s) successfully uploaded But Something went wrong !',
+                            'files': results, 'errors': unreadable})
+            resp.status_code = 500
+            return resp
+
+        # top-level size/Centroid keep describing the last file, as before
         resp = jsonify({'message': 'Files successfully uploaded',
-                       'size': [img.width, img.height], "Centroid": [h//2, w//2],"Path_img":"/Upload"})
+                       'size': results[-1]['size'], "Centroid": results[-1]['Centroid'],
+                       "Path_img":"/Upload", 'files': results})
         resp.status_code = 201
         return resp
     else:
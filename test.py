@@ -1,6 +1,5 @@
 from tkinter import Y
 import requests
-from PIL import Image
 import cv2 as cv
 import numpy as np
 
@@ -20,7 +19,7 @@ print(w//2,h//2)
 
 if circles is not None:
     # convert the (x, y) coordinates and radius of the circles to integers
-    circles = np.round(circles[0, :]).astype("int")
+    circles = np.rint(circles[0]).astype(np.int32)
     # loop over the (x, y) coordinates and radius of the circles
     for (x, y, r) in circles:
         # draw the circle in the output image, then draw a rectangle